@@ -0,0 +1,121 @@
+import weakref
+
+import numpy as np
+
+from collections import OrderedDict
+
+
+class CacheDistancias:
+    def __init__(self, memoria_maxima=256 * 1024 ** 2, recalcular_cada=50, fraccion_delta=0.5):
+        """
+        Cache de distancias cuadradas por individuo para evaluar el fitness de forma incremental.
+        Las entradas se asocian a cada objeto individuo (por identidad) y a un único conjunto de datos; si se evalúa
+        con otro arreglo de datos el cache se vacía. Los datos no deben modificarse en sitio mientras se use el cache.
+        :param memoria_maxima: Presupuesto de memoria en bytes; al superarlo se desalojan las entradas menos usadas.
+        :param recalcular_cada: Número de actualizaciones incrementales tras las cuales se recalcula la distancia exacta.
+        :param fraccion_delta: Fracción máxima de genes modificados para usar la actualización incremental.
+        """
+        self.memoria_maxima = memoria_maxima
+        self.recalcular_cada = recalcular_cada
+        self.fraccion_delta = fraccion_delta
+        self._entradas = OrderedDict()
+        self._memoria_usada = 0
+        self._datos = None
+        self.estadisticas = {'evaluaciones_completas': 0, 'actualizaciones_delta': 0, 'aciertos': 0, 'desalojos': 0}
+
+    @property
+    def memoria_usada(self):
+        """Memoria en bytes ocupada por las entradas del cache."""
+        return self._memoria_usada
+
+    def distancias2(self, individuo, datos, origen=None):
+        """
+        Retorna el vector de distancias cuadradas del genoma del individuo a cada punto de los datos.
+        :param individuo: Individuo a evaluar.
+        :param datos: Datos con los que se evalúa.
+        :param origen: Individuo del que proviene (p. ej. el padre de una copia mutada). Si el individuo no está en el
+                       cache, se parte de las distancias del origen y se actualizan los genes que difieren.
+        """
+        self._verificar_datos(datos)
+
+        entrada = self._buscar(individuo)
+        if entrada is None and origen is not None:
+            entrada_origen = self._buscar(origen)
+            if entrada_origen is not None:
+                entrada = self._guardar(individuo, entrada_origen['genoma'], entrada_origen['distancias2'].copy(), entrada_origen['actualizaciones'])
+
+        if entrada is not None:
+            genoma_cache, distancias2, actualizaciones = entrada['genoma'], entrada['distancias2'], entrada['actualizaciones']
+            genes = np.flatnonzero(individuo.genoma != genoma_cache)
+
+            if len(genes) == 0:
+                self.estadisticas['aciertos'] += 1
+                return distancias2
+
+            if len(genes) <= self.fraccion_delta * len(genoma_cache) and actualizaciones < self.recalcular_cada:
+                # Sumar la nueva diferencia cuadrada por gen y restar la anterior: O(N·k)
+                viejos = genoma_cache[genes]
+                nuevos = individuo.genoma[genes]
+                columnas = datos[:, genes]
+                distancias2 += np.sum((columnas - nuevos) ** 2 - (columnas - viejos) ** 2, axis=1)
+                np.maximum(distancias2, 0, out=distancias2)
+                genoma_cache[genes] = nuevos
+                entrada['actualizaciones'] = actualizaciones + 1
+                self.estadisticas['actualizaciones_delta'] += 1
+                return distancias2
+
+        # Evaluación completa (individuo nuevo, p. ej. tras un cruce, o recálculo periódico)
+        distancias2 = np.sum((datos - individuo.genoma) ** 2, axis=1)
+        self.estadisticas['evaluaciones_completas'] += 1
+        self._guardar(individuo, individuo.genoma, distancias2, 0)
+        return distancias2
+
+    def limpiar(self):
+        """Elimina todas las entradas del cache."""
+        self._entradas.clear()
+        self._memoria_usada = 0
+
+    def _verificar_datos(self, datos):
+        """Vacía el cache si los datos no son el mismo arreglo con el que se calcularon las entradas."""
+        if self._datos is None or self._datos() is not datos:
+            self.limpiar()
+            self._datos = weakref.ref(datos)
+
+    def _buscar(self, individuo):
+        """Retorna la entrada del individuo (marcándola como usada recientemente) o None."""
+        entrada = self._entradas.get(id(individuo))
+        if entrada is None or entrada['individuo']() is not individuo:
+            return None
+        self._entradas.move_to_end(id(individuo))
+        return entrada
+
+    def _eliminar(self, clave):
+        """Elimina una entrada y descuenta su memoria."""
+        entrada = self._entradas.pop(clave)
+        self._memoria_usada -= entrada['genoma'].nbytes + entrada['distancias2'].nbytes
+
+    def _guardar(self, individuo, genoma, distancias2, actualizaciones):
+        """Guarda una entrada y desaloja las menos usadas si se supera el presupuesto de memoria."""
+        clave = id(individuo)
+        if clave in self._entradas:
+            self._eliminar(clave)
+
+        genoma = np.array(genoma, dtype=float)
+        tamano = genoma.nbytes + distancias2.nbytes
+        if tamano > self.memoria_maxima:
+            return None
+
+        while self._entradas and self._memoria_usada + tamano > self.memoria_maxima:
+            self._eliminar(next(iter(self._entradas)))
+            self.estadisticas['desalojos'] += 1
+
+        # La entrada se elimina cuando el individuo deja de existir, para que su id no se reutilice con datos ajenos
+        def _al_eliminar(referencia, clave=clave):
+            actual = self._entradas.get(clave)
+            if actual is not None and actual['individuo'] is referencia:
+                self._eliminar(clave)
+
+        entrada = {'individuo': weakref.ref(individuo, _al_eliminar), 'genoma': genoma, 'distancias2': distancias2, 'actualizaciones': actualizaciones}
+        self._entradas[clave] = entrada
+        self._memoria_usada += tamano
+        return entrada
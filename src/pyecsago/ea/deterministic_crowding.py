@@ -4,28 +4,91 @@ from pyecsago.interface.base import NichingStrategy
 
 
 class DeterministicCrowding(NichingStrategy):
+    def __init__(self, k_vecinos=None):
+        """
+        :param k_vecinos: Si se indica, restringe el apareamiento: la población se recorre en un orden aleatorio y
+                          cada individuo aún sin pareja se aparea con uno de sus k genomas más cercanos entre los que
+                          tampoco tienen pareja, de modo que cada individuo participa en una sola pareja por generación.
+                          El índice de vecinos se actualiza con cada reemplazo, de modo que las siguientes parejas de
+                          la generación ya ven a los hijos sobrevivientes. Por defecto los padres se eligen al azar.
+        """
+        if k_vecinos is not None and k_vecinos < 1:
+            raise ValueError(f"k_vecinos debe ser al menos 1, se recibió {k_vecinos}")
+        self.k_vecinos = k_vecinos
+        self._origen = None
+        self._individuos = None
+        self._genomas = None
+        self._orden = None
+        self._emparejados = None
+        self._ultimos = None
+
     def seleccionar_padres(self, individuos):
-        """Seleccionar padres aleatoriamente."""
-        return np.random.choice(individuos, 2, replace=False)
+        """Seleccionar padres aleatoriamente, o por vecindad genética si hay restricción de apareamiento."""
+        if self.k_vecinos is None:
+            return np.random.choice(individuos, 2, replace=False)
+
+        # Reconstruir el índice de vecinos cuando cambia la población (nueva generación)
+        if individuos is not self._origen or len(individuos) != len(self._individuos):
+            self._origen = individuos
+            self._individuos = list(individuos)
+            self._genomas = np.array([individuo.genoma for individuo in individuos], dtype=float)
+            self._orden = None
+
+        n = len(self._individuos)
+        if n < 2:
+            raise ValueError("Se necesitan al menos dos individuos para seleccionar padres")
+
+        # Primer padre: el siguiente individuo sin pareja de la permutación; si todos tienen pareja, empieza otra ronda
+        while self._orden and self._emparejados[self._orden[-1]]:
+            self._orden.pop()
+        if not self._orden:
+            self._orden = list(np.random.permutation(n))
+            self._emparejados = np.zeros(n, dtype=bool)
+        i = self._orden.pop()
+        self._emparejados[i] = True
+
+        # Pareja entre los k más cercanos sin pareja; si no queda ninguno (población impar), entre todos
+        distancias = np.sum((self._genomas - self._genomas[i]) ** 2, axis=1)
+        candidatos = ~self._emparejados if np.any(~self._emparejados) else np.arange(n) != i
+        distancias[~candidatos] = np.inf
+        k = min(self.k_vecinos, np.sum(candidatos))
+        vecinos = np.argpartition(distancias, k - 1)[:k]
+        j = np.random.choice(vecinos)
+        self._emparejados[j] = True
+
+        self._ultimos = (i, j)
+        return self._individuos[i], self._individuos[j]
 
     def reemplazar(self, padres, hijos):
         """Aplicar la estrategia de niching de deterministic crowding."""
+        poblacion_final = self._reemplazar(padres, hijos)
+
+        # Los sobrevivientes ocupan en el índice las posiciones de la pareja de padres que reemplazan
+        if self.k_vecinos is not None and self._ultimos is not None:
+            for posicion, padre, sobreviviente in zip(self._ultimos, padres, poblacion_final):
+                if self._individuos[posicion] is padre:
+                    self._individuos[posicion] = sobreviviente
+                    self._genomas[posicion] = sobreviviente.genoma
+            self._ultimos = None
+
+        return poblacion_final
+
+    def rival(self, hijo, padre, otro_padre):
+        """Retorna el padre con el que compite el hijo en el reemplazo: el más cercano genéticamente."""
+        if np.linalg.norm(hijo.genoma - padre.genoma) < np.linalg.norm(hijo.genoma - otro_padre.genoma):
+            return padre
+        return otro_padre
+
+    def _reemplazar(self, padres, hijos):
+        """Decide, para cada hijo, si reemplaza al padre más cercano."""
         poblacion_final = []
         for i in range(2):
-            padre = padres[i]
-            hijo = hijos[i]
-
-            # Comparar similitud genética y fitness
-            if np.linalg.norm(hijo.genoma - padre.genoma) < np.linalg.norm(hijo.genoma - padres[1-i].genoma):
-                if hijo.fitness > padre.fitness:
-                    poblacion_final.append(hijo)
-                else:
-                    poblacion_final.append(padre)
+            # Comparar fitness con el padre más similar genéticamente
+            rival = self.rival(hijos[i], padres[i], padres[1-i])
+            if hijos[i].fitness > rival.fitness:
+                poblacion_final.append(hijos[i])
             else:
-                if hijo.fitness > padres[1-i].fitness:
-                    poblacion_final.append(hijo)
-                else:
-                    poblacion_final.append(padres[1-i])
+                poblacion_final.append(rival)
 
         return poblacion_final
     
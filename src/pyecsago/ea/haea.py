@@ -8,6 +8,44 @@ class HAEA(OperadoresEvolutivos):
     def __init__(self, tasa_aprendizaje=None):
         self.tasa_aprendizaje = np.random.uniform(0, 1) if tasa_aprendizaje is None else tasa_aprendizaje
 
+    def cruzar(self, padre1, padre2):
+        """
+        Selecciona un operador según las tasas del primer padre y lo registra en ambos padres y en los hijos.
+        Si el operador es un cruce se aplica entre los padres; en caso contrario (o si el cruce no se aplica)
+        los hijos son copias de los padres, que `mutar` modifica sin alterar a los padres.
+        """
+        operador = self.seleccionar_operador(padre1.tasas_operadores)
+        padre1.operador = padre2.operador = operador
+
+        hijo1, hijo2 = padre1, padre2
+        if operador == 'cruce_lc':
+            hijo1, hijo2 = self._linear_crossover(padre1, padre2)
+        elif operador == 'cruce_lcd':
+            hijo1, hijo2 = self._linear_crossover_per_dimension(padre1, padre2)
+
+        # Nunca retornar a los padres: la mutación y la evaluación se hacen sobre los hijos
+        hijo1 = self._copiar(padre1) if hijo1 is padre1 else hijo1
+        hijo2 = self._copiar(padre2) if hijo2 is padre2 else hijo2
+        hijo1.operador = hijo2.operador = operador
+
+        return hijo1, hijo2
+
+    def mutar(self, individuo):
+        """Aplica al individuo la mutación registrada por `cruzar`; no hace nada si el operador fue un cruce."""
+        operador = getattr(individuo, 'operador', None)
+        if operador == 'mutacion_gaussiana':
+            self._mutacion_gaussiana(individuo)
+        elif operador == 'mutacion_gaussiana_adaptativa':
+            self._mutacion_gaussiana_adaptativa(individuo)
+        return individuo
+
+    @staticmethod
+    def _copiar(individuo):
+        """Crea un nuevo individuo con copias del genoma, σ², tasas y fitness del original."""
+        copia = GeneraIndividuo(genoma=np.copy(individuo.genoma), sigma2=np.copy(individuo.sigma2), tasas_operadores=dict(individuo.tasas_operadores))
+        copia.fitness = individuo.fitness
+        return copia
+
     def seleccionar_operador(self, tasas_operadores):
         """ Selecciona un operador basado en las tasas del individuo """
         operadores = list(tasas_operadores.keys())
@@ -30,8 +68,12 @@ class HAEA(OperadoresEvolutivos):
             return self._linear_crossover_per_dimension(individuo, padre2)
         return individuo
     
-    def ajustar_tasas(self, individuo, operador, recompensa=True):
-        """ Ajusta las tasas del operador seleccionado, recompensando o penalizando """
+    def ajustar_tasas(self, individuo, recompensa=True, operador=None):
+        """ Ajusta las tasas del operador seleccionado (por defecto el registrado en el individuo), recompensando o penalizando """
+        operador = getattr(individuo, 'operador', None) if operador is None else operador
+        if operador is None:
+            return
+
         if recompensa:
             individuo.tasas_operadores[operador] *= (1.0 + self.tasa_aprendizaje)
         else:
@@ -73,8 +115,8 @@ class HAEA(OperadoresEvolutivos):
             hijo2_genoma = (1 - alpha) * padre1.genoma + alpha * padre2.genoma
 
             # Crear dos nuevos individuos (hijos) con el genoma cruzado y las tasas heredadas
-            hijo1 = GeneraIndividuo(genoma=hijo1_genoma, tasas_operadores=padre1.tasas_operadores)
-            hijo2 = GeneraIndividuo(genoma=hijo2_genoma, tasas_operadores=padre2.tasas_operadores)
+            hijo1 = GeneraIndividuo(genoma=hijo1_genoma, sigma2=np.copy(padre1.sigma2), tasas_operadores=dict(padre1.tasas_operadores))
+            hijo2 = GeneraIndividuo(genoma=hijo2_genoma, sigma2=np.copy(padre2.sigma2), tasas_operadores=dict(padre2.tasas_operadores))
 
             return hijo1, hijo2  # Devolver los dos hijos
         return padre1, padre2
@@ -96,8 +138,8 @@ class HAEA(OperadoresEvolutivos):
                 nuevo_genoma2[i] = (1 - alpha) * padre1.genoma[i] + alpha * padre2.genoma[i]
 
             # Crear dos nuevos individuos (hijos) con el genoma cruzado y las tasas heredadas
-            hijo1 = GeneraIndividuo(genoma=nuevo_genoma1, tasas_operadores=padre1.tasas_operadores)
-            hijo2 = GeneraIndividuo(genoma=nuevo_genoma2, tasas_operadores=padre2.tasas_operadores)
+            hijo1 = GeneraIndividuo(genoma=nuevo_genoma1, sigma2=np.copy(padre1.sigma2), tasas_operadores=dict(padre1.tasas_operadores))
+            hijo2 = GeneraIndividuo(genoma=nuevo_genoma2, sigma2=np.copy(padre2.sigma2), tasas_operadores=dict(padre2.tasas_operadores))
 
             return hijo1, hijo2  # Devolver los dos hijos
         return padre1, padre2
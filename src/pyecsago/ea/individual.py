@@ -14,9 +14,15 @@ class GeneraIndividuo(Individuo):
         super().__init__(genoma, sigma2, *args, **kawargs)
         self.normalizar_tasas()
 
-    def calcular_fitness(self, datos, weight_threshold, tipo_metrica='euclidiana', p_minkowski=2):
-        """ Calcula el fitness usando diferentes métricas de distancia. """
-        if tipo_metrica == 'euclidiana':
+    def calcular_fitness(self, datos, weight_threshold, tipo_metrica='euclidiana', p_minkowski=2, cache=None, origen=None):
+        """
+        Calcula el fitness usando diferentes métricas de distancia.
+        Si se indica un `CacheDistancias` y la métrica es euclidiana, las distancias se actualizan de forma incremental,
+        partiendo de las del individuo `origen` (p. ej. su padre) si este individuo aún no está en el cache.
+        """
+        if tipo_metrica == 'euclidiana' and cache is not None:
+            distancias = np.sqrt(cache.distancias2(self, datos, origen=origen))
+        elif tipo_metrica == 'euclidiana':
             distancias = np.array([euclidean(self.genoma, punto) for punto in datos])
         elif tipo_metrica == 'minkowski':
             distancias = np.array([minkowski(self.genoma, punto, p=p_minkowski) for punto in datos])
@@ -1,11 +1,11 @@
 import numpy as np
 
 from pyecsago.interface.base import Poblacion
-from pyecsago.utils.funcs import visualizar_resultados
+from pyecsago.utils.funcs import visualizar_resultados, visualizar_resultados_densidad
 
 
 class GeneraPoblacion(Poblacion):
-    def __init__(self, num_individuos, individuo_class, niching_strategy, operadores_strategy, datos, dimensiones, weight_threshold, *args, **kwargs):
+    def __init__(self, num_individuos, individuo_class, niching_strategy, operadores_strategy, datos, dimensiones, weight_threshold, *args, cache_distancias=None, modelo_sustituto=None, fidelidad_inicial=None, factor_fidelidad=2, estratos=10, **kwargs):
         """
         Inicializa la población concreta con una estrategia de niching, operadores y datos.
         :param num_individuos: Número de individuos en la población
@@ -14,6 +14,13 @@ class GeneraPoblacion(Poblacion):
         :param operadores_strategy: Estrategia de operadores evolutivos (HAEA)
         :param datos: Datos con los que se trabajará
         :param dimensiones: Dimensiones del genoma
+        :param weight_threshold: Umbral de peso para considerar un punto dentro del nicho de un individuo
+        :param cache_distancias: Cache de distancias para evaluar el fitness de forma incremental (opcional)
+        :param modelo_sustituto: Modelo sustituto para omitir la evaluación de hijos que no mejorarían a su padre (opcional)
+        :param fidelidad_inicial: Tamaño de la submuestra de datos en las primeras generaciones, como fracción (<= 1) o
+                                  número de puntos. Si se indica, la muestra crece geométricamente hasta usar todos los datos (opcional)
+        :param factor_fidelidad: Factor de crecimiento de la submuestra entre niveles de fidelidad
+        :param estratos: Número de estratos para el muestreo estratificado de la submuestra
         """
         # Inicializar la población con individuos, generando un genoma aleatorio para cada uno
         self.individuos = [individuo_class(genoma=np.random.rand(dimensiones), *args, **kwargs) for _ in range(num_individuos)]
@@ -24,10 +31,33 @@ class GeneraPoblacion(Poblacion):
         self.datos = datos
         self.generaciones = 0
         self.weight_threshold = weight_threshold
+        self.cache_distancias = cache_distancias
+        self.modelo_sustituto = modelo_sustituto
+        if fidelidad_inicial is not None and fidelidad_inicial <= 0:
+            raise ValueError(f"fidelidad_inicial debe ser mayor que 0, se recibió {fidelidad_inicial}")
+        if factor_fidelidad <= 1:
+            raise ValueError(f"factor_fidelidad debe ser mayor que 1, se recibió {factor_fidelidad}")
+        self.fidelidad_inicial = fidelidad_inicial
+        self.factor_fidelidad = factor_fidelidad
+        self.estratos = estratos
+
+        # Datos usados para evaluar el fitness y factor de escala del fitness respecto a todos los datos
+        self._datos_evaluacion = datos
+        self._escala_fitness = 1.0
+        self._orden_muestra = None
+        self._tamano_fidelidad = None
+
+        # puntos_evaluados incluye las reevaluaciones por cambio de fidelidad, que también se reportan aparte en
+        # puntos_reevaluacion; puntos_fidelidad_completa es lo que habría evaluado la misma ejecución con todos los datos
+        self.estadisticas_fidelidad = {'puntos_evaluados': 0, 'puntos_reevaluacion': 0, 'puntos_fidelidad_completa': 0}
 
     def evolucionar(self, num_generaciones):
         """Evoluciona la población durante varias generaciones aplicando niching y operadores evolutivos."""
-        for _ in range(num_generaciones):
+        programa = self.programa_fidelidad(num_generaciones) if self.fidelidad_inicial is not None else None
+        for generacion in range(num_generaciones):
+            if programa is not None and programa[generacion] != len(self._datos_evaluacion):
+                self._cambiar_fidelidad(programa[generacion])
+
             nuevos_individuos = []
             for _ in range(len(self.individuos) // 2):
                 # Usar la estrategia de niching para seleccionar padres
@@ -38,15 +68,16 @@ class GeneraPoblacion(Poblacion):
                 self.operadores_strategy.mutar(hijo1)
                 self.operadores_strategy.mutar(hijo2)
 
-                hijo1.calcular_fitness(self.datos, self.weight_threshold)
-                hijo2.calcular_fitness(self.datos, self.weight_threshold)
-
-                # Evaluar si los operadores fueron exitosos
-                recompensa1 = self.operadores_strategy.evaluar_operador(padre1, hijo1)
-                recompensa2 = self.operadores_strategy.evaluar_operador(padre2, hijo2)
+                evaluado1 = self._evaluar_hijo(hijo1, padre1, padre2)
+                evaluado2 = self._evaluar_hijo(hijo2, padre2, padre1)
 
-                self.operadores_strategy.ajustar_tasas(padre1, recompensa1)
-                self.operadores_strategy.ajustar_tasas(padre2, recompensa2)
+                # Evaluar si los operadores fueron exitosos (sólo con fitness real, no con predicciones)
+                if evaluado1:
+                    recompensa1 = self.operadores_strategy.evaluar_operador(padre1, hijo1)
+                    self.operadores_strategy.ajustar_tasas(padre1, recompensa1)
+                if evaluado2:
+                    recompensa2 = self.operadores_strategy.evaluar_operador(padre2, hijo2)
+                    self.operadores_strategy.ajustar_tasas(padre2, recompensa2)
 
                 # Usar niching strategy para reemplazar individuos
                 nuevos_individuos += self.niching_strategy.reemplazar([padre1, padre2], [hijo1, hijo2])
@@ -57,7 +88,127 @@ class GeneraPoblacion(Poblacion):
     def evaluar_fitness_poblacion(self):
         """Evalúa el fitness de cada individuo en la población"""
         for individuo in self.individuos:
-            individuo.calcular_fitness(datos=self.datos, weight_threshold=self.weight_threshold)
+            self._evaluar_individuo(individuo)
+
+    def _evaluar_individuo(self, individuo, origen=None, reevaluacion=False):
+        """
+        Evalúa el fitness de un individuo, usando el cache de distancias si está configurado.
+        :param origen: Padre del individuo, del que el cache puede partir para una actualización incremental.
+        :param reevaluacion: True si la evaluación se debe a un cambio de fidelidad (no ocurriría con todos los datos).
+        """
+        if self.cache_distancias is not None:
+            individuo.calcular_fitness(datos=self._datos_evaluacion, weight_threshold=self.weight_threshold, cache=self.cache_distancias, origen=origen)
+        else:
+            individuo.calcular_fitness(datos=self._datos_evaluacion, weight_threshold=self.weight_threshold)
+
+        # Con una submuestra, el número de puntos del nicho se escala al total de datos; σ² es un promedio y no cambia
+        individuo.fitness *= self._escala_fitness
+        fitness = individuo.fitness
+        self.estadisticas_fidelidad['puntos_evaluados'] += len(self._datos_evaluacion)
+        if reevaluacion:
+            self.estadisticas_fidelidad['puntos_reevaluacion'] += len(self._datos_evaluacion)
+        else:
+            self.estadisticas_fidelidad['puntos_fidelidad_completa'] += len(self.datos)
+
+        # Todo individuo con fitness real alimenta el archivo del modelo sustituto
+        if self.modelo_sustituto is not None:
+            self.modelo_sustituto.agregar(individuo)
+        return fitness
+
+    def _evaluar_hijo(self, hijo, padre, otro_padre):
+        """
+        Evalúa el fitness de un hijo. Con un modelo sustituto, la evaluación real se omite cuando la predicción
+        indica que el hijo no superaría al padre con el que compite según la estrategia de niching.
+        :return: True si se calculó el fitness real; False si el hijo fue descartado por el modelo sustituto.
+        """
+        # Sin modelo, o si el "hijo" es uno de los padres, se evalúa siempre
+        if self.modelo_sustituto is None or hijo is padre or hijo is otro_padre:
+            self._evaluar_individuo(hijo, origen=padre)
+            return True
+
+        # Padre con el que competirá el hijo en el reemplazo
+        rival = self.niching_strategy.rival(hijo, padre, otro_padre)
+
+        evaluar, prediccion, exploracion = self.modelo_sustituto.debe_evaluar(hijo, rival)
+        if not evaluar:
+            # Marcar el hijo como "no mejora": pierde frente a cualquier padre en el reemplazo
+            hijo.fitness = -np.inf
+            return False
+
+        fitness = self._evaluar_individuo(hijo, origen=padre)
+        if prediccion is not None:
+            self.modelo_sustituto.registrar(prediccion, fitness, rival.fitness, exploracion=exploracion)
+        return True
+
+    def programa_fidelidad(self, num_generaciones):
+        """
+        Calcula el tamaño de la submuestra para cada generación. Los tamaños crecen geométricamente con
+        `factor_fidelidad` desde `fidelidad_inicial`, y las últimas generaciones usan todos los datos.
+        El programa continúa entre llamadas a `evolucionar`: nunca baja del tamaño de muestra ya alcanzado, de modo
+        que tras una ejecución completa las siguientes generaciones usan todos los datos.
+        :param num_generaciones: Número de generaciones a evolucionar.
+        :return: Lista con el número de puntos a usar en cada generación.
+        """
+        n = len(self.datos)
+        inicial = self.fidelidad_inicial * n if self.fidelidad_inicial <= 1 else self.fidelidad_inicial
+        tamano = int(min(max(np.ceil(inicial), 1), n))
+
+        niveles = []
+        while tamano < n:
+            niveles.append(tamano)
+            tamano = int(np.ceil(tamano * self.factor_fidelidad))
+        niveles.append(n)
+
+        # Repartir las generaciones entre niveles, asegurando que la última use todos los datos
+        num_niveles = len(niveles)
+        programa = [niveles[max(0, num_niveles - 1 - (num_generaciones - 1 - g) * num_niveles // num_generaciones)] for g in range(num_generaciones)]
+
+        if self._tamano_fidelidad is not None:
+            programa = [max(tamano, self._tamano_fidelidad) for tamano in programa]
+        return programa
+
+    def _muestra_estratificada(self, tamano):
+        """
+        Retorna una submuestra estratificada de los datos. Los estratos son cuantiles de la proyección sobre el eje
+        de mayor varianza. Cada muestra es un prefijo de un mismo orden de los datos, por lo que las muestras de
+        distintos tamaños están anidadas (la mayor contiene a la menor) y ningún estrato pierde puntos al crecer.
+        """
+        n = len(self.datos)
+        if tamano >= n:
+            return self.datos
+
+        if self._orden_muestra is None:
+            covarianza = np.atleast_2d(np.cov(self.datos, rowvar=False))
+            eje = np.linalg.eigh(covarianza)[1][:, -1]
+            proyeccion = (self.datos - np.mean(self.datos, axis=0)) @ eje
+            bordes = np.quantile(proyeccion, np.linspace(0, 1, self.estratos + 1)[1:-1])
+            etiquetas = np.digitize(proyeccion, bordes)
+
+            # Cada punto recibe su posición relativa (j + 0.5) / tamaño dentro de su estrato, en orden aleatorio.
+            # Ordenar por esa posición intercala los estratos en proporción a su tamaño: con estratos de igual tamaño
+            # (cuantiles), cualquier prefijo tiene de cada estrato su cuota proporcional con un error de a lo sumo un punto
+            posiciones = np.empty(n)
+            for e in range(self.estratos):
+                indices = np.random.permutation(np.flatnonzero(etiquetas == e))
+                posiciones[indices] = (np.arange(len(indices)) + 0.5) / len(indices)
+            self._orden_muestra = np.lexsort((np.random.rand(n), posiciones))
+
+        return self.datos[np.sort(self._orden_muestra[:tamano])]
+
+    def _cambiar_fidelidad(self, tamano):
+        """Cambia la submuestra de evaluación y reevalúa la población para que las comparaciones sigan siendo justas."""
+        self._datos_evaluacion = self._muestra_estratificada(tamano)
+        self._tamano_fidelidad = tamano
+        self._escala_fitness = len(self.datos) / len(self._datos_evaluacion)
+
+        # Las distancias y los fitness archivados corresponden a la muestra anterior
+        if self.cache_distancias is not None:
+            self.cache_distancias.limpiar()
+        if self.modelo_sustituto is not None:
+            self.modelo_sustituto.limpiar()
+
+        for individuo in self.individuos:
+            self._evaluar_individuo(individuo, reevaluacion=True)
 
     def extraer_prototipos(self, umbral_fitness, kmin):
         """
@@ -82,15 +233,20 @@ class GeneraPoblacion(Poblacion):
 
         return prototipos
 
-    def refinar_prototipos(self, prototipos, iteraciones=10, kmin=0.05):
+    def refinar_prototipos(self, prototipos, iteraciones=10, kmin=0.05, acelerado=False):
         """
         Refinar los prototipos utilizando Maximal Density Estimator (MDE), asegurando que la distancia genética mínima
         y la dispersión genética se respeten.
         :param prototipos: Lista de individuos que representan los prototipos.
         :param iteraciones: Número de iteraciones para refinar los prototipos.
         :param kmin: Umbral mínimo de distancia genética entre prototipos.
+        :param acelerado: Si es True, usa cotas de la desigualdad triangular (estilo Hamerly) para omitir distancias
+                          que no pueden cambiar la asignación de un punto. El resultado es el mismo que el exacto.
         :return: Prototipos refinados.
         """
+        if acelerado:
+            return self._refinar_prototipos_acelerado(prototipos, iteraciones, kmin)
+
         for _ in range(iteraciones):
             # Inicializar clusters vacíos para cada prototipo
             clusters = {i: [] for i in range(len(prototipos))}
@@ -103,49 +259,160 @@ class GeneraPoblacion(Poblacion):
                     clusters[cluster_idx].append(punto)
 
             # Ajustar la posición de cada prototipo basado en los puntos asignados a su cluster
-            for i, prototipo in enumerate(prototipos):
-                if clusters[i]:  # Si el cluster no está vacío
-                    # Calcular la nueva posición del prototipo como la media ponderada (MDE)
-                    puntos_cluster = np.array(clusters[i])
-                    distancias_puntos = np.linalg.norm(puntos_cluster - prototipo.genoma, axis=1)
-                    
-                    # Pesos inversamente proporcionales a las distancias (opcional)
-                    w_ij = 1 / (distancias_puntos + 1e-6)
-                    nuevo_centro = np.average(puntos_cluster, axis=0, weights=w_ij)
-                    
-                    # Calcular nueva σ² según la fórmula MDE
-                    num_sigma = np.sum(w_ij * (distancias_puntos ** 4))
-                    denom_sigma = 3 * np.sum(w_ij * (distancias_puntos ** 2))
-                    nueva_sigma = num_sigma / denom_sigma if denom_sigma != 0 else prototipo.sigma2
-                    
-                    # Verificar la distancia genética mínima (kmin) antes de actualizar el prototipo
-                    if all(np.linalg.norm(nuevo_centro - otro_prototipo.genoma) > kmin for j, otro_prototipo in enumerate(prototipos) if j != i):
-                        prototipo.genoma = nuevo_centro  # Actualizar la posición del prototipo
-                        prototipo.sigma2 = nueva_sigma  # Actualizar la dispersión genética
+            self._actualizar_prototipos(prototipos, clusters, kmin)
+
+        total = iteraciones * len(self.datos) * len(prototipos)
+        self.estadisticas_refinamiento = {'distancias_calculadas': total, 'distancias_omitidas': 0}
+
+        return prototipos
+
+    def _actualizar_prototipos(self, prototipos, clusters, kmin):
+        """
+        Mueve cada prototipo a la media ponderada (MDE) de los puntos de su cluster y actualiza su σ².
+        :return: Desplazamiento de cada prototipo.
+        """
+        desplazamientos = np.zeros(len(prototipos))
+        for i, prototipo in enumerate(prototipos):
+            if len(clusters[i]) > 0:  # Si el cluster no está vacío
+                # Calcular la nueva posición del prototipo como la media ponderada (MDE)
+                puntos_cluster = np.array(clusters[i])
+                distancias_puntos = np.linalg.norm(puntos_cluster - prototipo.genoma, axis=1)
+                
+                # Pesos inversamente proporcionales a las distancias (opcional)
+                w_ij = 1 / (distancias_puntos + 1e-6)
+                nuevo_centro = np.average(puntos_cluster, axis=0, weights=w_ij)
+                
+                # Calcular nueva σ² según la fórmula MDE
+                num_sigma = np.sum(w_ij * (distancias_puntos ** 4))
+                denom_sigma = 3 * np.sum(w_ij * (distancias_puntos ** 2))
+                nueva_sigma = num_sigma / denom_sigma if denom_sigma != 0 else prototipo.sigma2
+                
+                # Verificar la distancia genética mínima (kmin) antes de actualizar el prototipo
+                if all(np.linalg.norm(nuevo_centro - otro_prototipo.genoma) > kmin for j, otro_prototipo in enumerate(prototipos) if j != i):
+                    desplazamientos[i] = np.linalg.norm(nuevo_centro - prototipo.genoma)
+                    prototipo.genoma = nuevo_centro  # Actualizar la posición del prototipo
+                    prototipo.sigma2 = nueva_sigma  # Actualizar la dispersión genética
+
+        return desplazamientos
+
+    def _refinar_prototipos_acelerado(self, prototipos, iteraciones, kmin):
+        """
+        Refinamiento MDE con asignación acelerada por cotas (Hamerly). Para cada punto se mantiene una cota superior
+        de la distancia a su prototipo asignado y una cota inferior de la distancia al segundo más cercano; si la
+        cota superior es menor que la inferior (o que la mitad de la distancia a la pareja de prototipos más cercana),
+        la asignación no puede cambiar y se omite el cálculo de distancias del punto.
+        """
+        datos = np.asarray(self.datos, dtype=float)
+        n, k = len(datos), len(prototipos)
+        self.estadisticas_refinamiento = {'distancias_calculadas': 0, 'distancias_omitidas': 0}
+        if k == 0 or n == 0:
+            return prototipos
+
+        # Margen relativo para que el redondeo nunca omita un punto cuya asignación podría cambiar
+        margen = 1 + 1e-9
+        calculadas = 0
+        asignacion = None
+
+        for _ in range(iteraciones):
+            centros = np.array([prototipo.genoma for prototipo in prototipos], dtype=float)
+
+            if asignacion is None:
+                # Primera iteración: todas las distancias
+                distancias = self._distancias_a_centros(datos, centros)
+                calculadas += n * k
+                asignacion, superior, inferior = self._cotas_desde_distancias(distancias)
+            else:
+                # Mitad de la distancia de cada prototipo a su prototipo más cercano
+                entre_centros = np.linalg.norm(centros[:, None, :] - centros[None, :, :], axis=2)
+                np.fill_diagonal(entre_centros, np.inf)
+                mitad = 0.5 * np.min(entre_centros, axis=1)
+
+                cota = np.maximum(mitad[asignacion], inferior)
+                revisar = np.flatnonzero(superior * margen >= cota)
+
+                # Ajustar la cota superior con la distancia real al prototipo asignado
+                superior[revisar] = np.linalg.norm(datos[revisar] - centros[asignacion[revisar]], axis=1)
+                calculadas += len(revisar)
+                revisar = revisar[superior[revisar] * margen >= cota[revisar]]
+
+                # Calcular las distancias a los demás prototipos sólo para los puntos que aún podrían cambiar;
+                # la distancia al prototipo asignado ya se conoce
+                if len(revisar) > 0:
+                    actuales = asignacion[revisar]
+                    distancias = np.empty((len(revisar), k))
+                    for j, centro in enumerate(centros):
+                        otros = actuales != j
+                        distancias[otros, j] = np.linalg.norm(datos[revisar[otros]] - centro, axis=1)
+                    distancias[np.arange(len(revisar)), actuales] = superior[revisar]
+                    calculadas += len(revisar) * (k - 1)
+                    asignacion[revisar], superior[revisar], inferior[revisar] = self._cotas_desde_distancias(distancias)
+
+            # Ajustar los prototipos con los puntos asignados (en el mismo orden que el refinamiento exacto)
+            clusters = {i: datos[asignacion == i] for i in range(k)}
+            desplazamientos = self._actualizar_prototipos(prototipos, clusters, kmin)
+
+            # Actualizar las cotas según el desplazamiento de los prototipos
+            superior += desplazamientos[asignacion]
+            inferior -= np.max(desplazamientos)
+
+        self.estadisticas_refinamiento = {
+            'distancias_calculadas': calculadas,
+            'distancias_omitidas': iteraciones * n * k - calculadas,
+        }
 
         return prototipos
 
-    def extraer_y_refinar_prototipos(self, umbral_fitness, kmin, iteraciones=10):
+    @staticmethod
+    def _distancias_a_centros(puntos, centros):
+        """Matriz (puntos, centros) de distancias euclidianas, calculada por columnas."""
+        distancias = np.empty((len(puntos), len(centros)))
+        for j, centro in enumerate(centros):
+            distancias[:, j] = np.linalg.norm(puntos - centro, axis=1)
+        return distancias
+
+    @staticmethod
+    def _cotas_desde_distancias(distancias):
+        """Asignación, distancia al prototipo asignado y distancia al segundo más cercano."""
+        filas = np.arange(len(distancias))
+        asignacion = np.argmin(distancias, axis=1)
+        superior = distancias[filas, asignacion]
+        if distancias.shape[1] > 1:
+            inferior = np.partition(distancias, 1, axis=1)[:, 1]
+        else:
+            inferior = np.full(len(distancias), np.inf)
+        return asignacion, superior, inferior
+
+    def extraer_y_refinar_prototipos(self, umbral_fitness, kmin, iteraciones=10, acelerado=False):
         """
         Realiza la extracción y refinamiento de prototipos.
         :param umbral_fitness: Umbral mínimo de fitness para la selección de prototipos.
         :param kmin: Distancia genética mínima para garantizar diversidad entre prototipos.
         :param iteraciones: Número de iteraciones para refinar los prototipos.
+        :param acelerado: Si es True, el refinamiento usa la asignación acelerada por cotas.
         :return: Prototipos refinados.
         """
         # Fase de extracción de prototipos
         prototipos = self.extraer_prototipos(umbral_fitness, kmin)
 
         # Fase de refinamiento de prototipos usando MDE
-        prototipos_refinados = self.refinar_prototipos(prototipos, iteraciones, kmin)
+        prototipos_refinados = self.refinar_prototipos(prototipos, iteraciones, kmin, acelerado=acelerado)
         
         return prototipos_refinados
 
-    def mostrar_visualizacion(self, centros_reales=None, prototipos_refinados=None):
-        """Muestra la visualización de los resultados."""
+    def mostrar_visualizacion(self, centros_reales=None, prototipos_refinados=None, archivo=None, **kwargs):
+        """
+        Muestra la visualización de los resultados.
+        :param centros_reales: Centros reales de los clusters (opcional).
+        :param prototipos_refinados: Prototipos refinados a dibujar.
+        :param archivo: Si se indica, se genera un mapa de densidad y se guarda en este archivo (PNG/SVG) sin usar pantalla.
+        :param kwargs: Parámetros adicionales para `visualizar_resultados_densidad` (modo, bins, proyeccion, ...).
+        """
         # Extraer los centros refinados (prototipos) después de la evolución
         centros_refinados = np.array([individuo.genoma for individuo in prototipos_refinados])
         sigmas_refinados = np.array([individuo.sigma2 for individuo in prototipos_refinados])
         
         # Visualizar los resultados
-        visualizar_resultados(self.datos, centros_reales=centros_reales, centros_refinados=centros_refinados, sigmas_refinados=sigmas_refinados)
+        if archivo is not None:
+            visualizar_resultados_densidad(self.datos, archivo, centros_reales=centros_reales, centros_refinados=centros_refinados, sigmas_refinados=sigmas_refinados, **kwargs)
+        else:
+            visualizar_resultados(self.datos, centros_reales=centros_reales, centros_refinados=centros_refinados, sigmas_refinados=sigmas_refinados)
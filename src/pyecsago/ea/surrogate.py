@@ -0,0 +1,125 @@
+import numpy as np
+
+
+class ModeloSustituto:
+    def __init__(self, k_vecinos=5, tamano_archivo=500, tasa_exploracion=0.1, margen=0.0, optimismo=1.0):
+        """
+        Modelo sustituto que predice el fitness de un individuo a partir de individuos ya evaluados cercanos en el espacio genético.
+        :param k_vecinos: Número de vecinos usados en la regresión por vecinos más cercanos.
+        :param tamano_archivo: Número máximo de individuos evaluados que se conservan en el archivo.
+        :param tasa_exploracion: Probabilidad de evaluar el fitness real aunque la predicción indique que el hijo no mejora.
+        :param margen: Margen relativo que se suma a la cota antes de compararla con el padre (mayor es más conservador).
+        :param optimismo: Número de rangos del fitness de los k vecinos que se suman a la predicción para decidir si el hijo
+                          puede mejorar. La media ponderada nunca supera al mejor vecino, por lo que con 0 el modelo omite
+                          a casi todo hijo que cae en una zona ya explorada, incluidos muchos que sí mejorarían; valores
+                          mayores omiten menos evaluaciones pero pierden menos mejoras.
+        """
+        self.k_vecinos = k_vecinos
+        self.tamano_archivo = tamano_archivo
+        self.tasa_exploracion = tasa_exploracion
+        self.margen = margen
+        self.optimismo = optimismo
+        self._genomas = None
+        self._fitness = np.zeros(tamano_archivo)
+        self._tamano = 0
+        self._posicion = 0
+        self._predicciones = []
+        self.evaluaciones_omitidas = 0
+        self.evaluaciones_reales = 0
+
+    def agregar(self, individuo):
+        """Agrega un individuo evaluado al archivo, reemplazando el más antiguo si está lleno."""
+        if self._genomas is None:
+            self._genomas = np.zeros((self.tamano_archivo, len(individuo.genoma)))
+        self._genomas[self._posicion] = individuo.genoma
+        self._fitness[self._posicion] = individuo.fitness
+        self._posicion = (self._posicion + 1) % self.tamano_archivo
+        self._tamano = min(self._tamano + 1, self.tamano_archivo)
+
+    def predecir(self, genoma):
+        """Predice el fitness de un genoma ponderando los k vecinos más cercanos por el inverso de la distancia."""
+        prediccion, _ = self._predecir_con_rango(genoma)
+        return prediccion
+
+    def _predecir_con_rango(self, genoma):
+        """Retorna la predicción y el rango (máximo - mínimo) del fitness de los k vecinos, o (None, None) sin archivo suficiente."""
+        if self._tamano < self.k_vecinos:
+            return None, None
+
+        distancias = np.linalg.norm(self._genomas[:self._tamano] - genoma, axis=1)
+        vecinos = np.argpartition(distancias, self.k_vecinos - 1)[:self.k_vecinos]
+        pesos = 1 / (distancias[vecinos] + 1e-12)
+        fitness = self._fitness[vecinos]
+        return np.sum(pesos * fitness) / np.sum(pesos), np.ptp(fitness)
+
+    def debe_evaluar(self, hijo, padre):
+        """
+        Decide si el fitness real del hijo debe evaluarse y lleva la cuenta de evaluaciones reales y omitidas.
+        :param hijo: Individuo candidato.
+        :param padre: Padre que el hijo reemplazaría.
+        :return: (evaluar, prediccion, exploracion). Si no hay predicción disponible siempre se evalúa;
+                 `exploracion` indica que se evalúa sólo por la tasa de exploración, aunque la predicción diga que no mejora.
+        """
+        prediccion, rango = self._predecir_con_rango(hijo.genoma)
+        if prediccion is None:
+            evaluar, exploracion = True, False
+        elif (prediccion + self.optimismo * rango) * (1 + self.margen) > padre.fitness:
+            evaluar, exploracion = True, False
+        else:
+            exploracion = np.random.rand() < self.tasa_exploracion
+            evaluar = exploracion
+
+        if evaluar:
+            self.evaluaciones_reales += 1
+        else:
+            self.evaluaciones_omitidas += 1
+        return evaluar, prediccion, exploracion
+
+    def registrar(self, prediccion, fitness_real, fitness_padre, exploracion=False):
+        """
+        Registra una predicción junto con el fitness real para medir la precisión del modelo.
+        :param exploracion: True si el hijo se evaluó por exploración (la predicción decía que no mejoraba).
+        """
+        self._predicciones.append((prediccion, fitness_real, fitness_padre, exploracion))
+
+    def limpiar(self):
+        """Vacía el archivo de individuos evaluados, conservando las estadísticas de precisión."""
+        self._tamano = 0
+        self._posicion = 0
+
+    def reporte(self):
+        """
+        Resume la precisión del modelo sobre los hijos evaluados con predicción disponible.
+        Las evaluaciones por exploración son una muestra aleatoria de los hijos que el modelo descartaría, por lo que
+        su tasa de fallos estima cuántas mejoras se pierden entre las evaluaciones omitidas.
+        :return: Diccionario con:
+                 - evaluaciones_omitidas / evaluaciones_reales / evaluaciones_exploracion: conteos de evaluaciones.
+                 - error_absoluto_medio: error medio entre fitness predicho y real.
+                 - precision_mejora: fracción de hijos con predicción "mejora" que realmente mejoraron a su padre.
+                 - tasa_fallos_exploracion: fracción de hijos con predicción "no mejora" (evaluados por exploración) que sí mejoraron.
+                 - mejoras_perdidas_estimadas: tasa_fallos_exploracion * evaluaciones_omitidas.
+        """
+        reporte = {
+            'evaluaciones_omitidas': self.evaluaciones_omitidas,
+            'evaluaciones_reales': self.evaluaciones_reales,
+            'evaluaciones_exploracion': 0,
+            'error_absoluto_medio': np.nan,
+            'precision_mejora': np.nan,
+            'tasa_fallos_exploracion': np.nan,
+            'mejoras_perdidas_estimadas': np.nan,
+        }
+        if not self._predicciones:
+            return reporte
+
+        predicho, real, padre, exploracion = np.array(self._predicciones, dtype=float).T
+        exploracion = exploracion.astype(bool)
+        mejora = real > padre
+
+        reporte['evaluaciones_exploracion'] = int(np.sum(exploracion))
+        reporte['error_absoluto_medio'] = float(np.mean(np.abs(predicho - real)))
+        if np.any(~exploracion):
+            reporte['precision_mejora'] = float(np.mean(mejora[~exploracion]))
+        if np.any(exploracion):
+            reporte['tasa_fallos_exploracion'] = float(np.mean(mejora[exploracion]))
+            reporte['mejoras_perdidas_estimadas'] = reporte['tasa_fallos_exploracion'] * self.evaluaciones_omitidas
+        return reporte
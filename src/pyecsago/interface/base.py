@@ -9,6 +9,7 @@ class Individuo(ABC):
         self.genoma = np.array(genoma)
         self.fitness = 0
         self.sigma2 = np.array(sigma2)
+        self.operador = None
         if tasas_operadores is None: self.tasas_operadores = {'mutacion_gaussiana': 0.3, 'mutacion_gaussiana_adaptativa': 0.3, 'cruce_lc': 0.2, 'cruce_lcd': 0.2} 
         else: self.tasas_operadores = tasas_operadores
         self.normalizar_tasas()
@@ -37,6 +38,16 @@ class Poblacion(ABC):
         pass
 
 class OperadoresEvolutivos(ABC):
+    @abstractmethod
+    def cruzar(self, padre1, padre2):
+        """Selecciona un operador para los padres y retorna dos hijos nuevos."""
+        pass
+
+    @abstractmethod
+    def mutar(self, individuo):
+        """Aplica al hijo la mutación seleccionada, si corresponde."""
+        pass
+
     @abstractmethod
     def seleccionar_operador(self, individuo):
         """Selecciona un operador basado en las tasas del individuo."""
@@ -62,3 +73,8 @@ class NichingStrategy(ABC):
     def reemplazar(self, padres, hijos):
         """Aplica la estrategia de reemplazo."""
         pass
+
+    @abstractmethod
+    def rival(self, hijo, padre, otro_padre):
+        """Retorna el padre con el que compite el hijo en el reemplazo."""
+        pass
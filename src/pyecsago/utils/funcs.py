@@ -1,6 +1,9 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+
 
 def generar_datos_sinteticos(num_clusters=10, puntos_por_cluster=50, dimensiones=2, dispersión=0.05, semilla=None):
     """
@@ -83,3 +86,133 @@ def visualizar_resultados(datos, centros_reales=None, centros_refinados=None, si
     
     # Mostrar gráfico
     plt.show()
+
+def _proyeccion_pca(datos, componentes=2, tamano_bloque=100000):
+    """
+    Calcula una proyección PCA de los datos recorriéndolos por bloques.
+
+    Retorna:
+    - media (np.array): Media de los datos.
+    - base (np.array): Matriz (dimensiones, componentes) con los ejes principales.
+    """
+    n, dimensiones = datos.shape
+    suma = np.zeros(dimensiones)
+    suma_productos = np.zeros((dimensiones, dimensiones))
+    for inicio in range(0, n, tamano_bloque):
+        bloque = np.asarray(datos[inicio:inicio + tamano_bloque], dtype=float)
+        suma += bloque.sum(axis=0)
+        suma_productos += bloque.T @ bloque
+
+    media = suma / n
+    covarianza = suma_productos / n - np.outer(media, media)
+    valores, vectores = np.linalg.eigh(covarianza)
+
+    # eigh retorna los valores propios en orden ascendente
+    orden = np.argsort(valores)[::-1][:componentes]
+    return media, vectores[:, orden]
+
+def visualizar_resultados_densidad(datos, archivo, centros_reales=None, centros_refinados=None, sigmas_refinados=None,
+                                   modo='histograma', bins=256, proyeccion='pca', tamano=(8, 6), dpi=100,
+                                   tamano_bloque=100000, titulo="Visualización de Clustering"):
+    """
+    Visualiza conjuntos de datos grandes como un mapa de densidad y guarda la figura en un archivo, sin necesidad de pantalla.
+
+    Los puntos se agregan en una rejilla de `bins` x `bins` celdas, por lo que el costo de dibujo depende de la
+    resolución de salida y no del número de puntos. Los prototipos y sus radios se dibujan encima.
+
+    Parámetros:
+    - datos (np.array): Puntos de datos (n, dimensiones). Datos de una dimensión se dibujan sobre el eje horizontal.
+    - archivo (str): Ruta del archivo de salida; el formato (PNG, SVG, ...) se deduce de la extensión.
+    - centros_reales (np.array): Centros reales de los clusters (opcional).
+    - centros_refinados (np.array): Centros refinados (prototipos) (opcional).
+    - sigmas_refinados (np.array): Radios σ² de los prototipos (opcional).
+    - modo (str): 'histograma' (histograma 2D acumulado por bloques) o 'hexbin'. Sólo 'histograma' recorre los datos
+      por bloques; 'hexbin' proyecta todos los puntos a la vez, por lo que está pensado para conjuntos que caben en memoria.
+    - bins (int): Resolución de la rejilla de densidad.
+    - proyeccion (str): 'pca' para proyectar datos de más de 2 dimensiones, o None para usar las dos primeras.
+    - tamano (tuple): Tamaño de la figura en pulgadas.
+    - dpi (int): Resolución de la figura.
+    - tamano_bloque (int): Número de puntos procesados por bloque.
+    - titulo (str): Título de la figura.
+
+    Retorna:
+    - archivo (str): Ruta del archivo generado.
+    """
+    if modo not in ('histograma', 'hexbin'):
+        raise ValueError(f"Modo de visualización no soportado: {modo}")
+
+    if datos.ndim == 1:
+        datos = datos.reshape(-1, 1)
+    n, dimensiones = datos.shape
+
+    # Definir la proyección a 2D aplicada a datos y centros
+    if proyeccion == 'pca' and dimensiones > 2:
+        media, base = _proyeccion_pca(datos, componentes=2, tamano_bloque=tamano_bloque)
+        proyectar = lambda x: (np.asarray(x, dtype=float).reshape(-1, dimensiones) - media) @ base
+        etiquetas = ("Componente principal 1", "Componente principal 2")
+    elif dimensiones < 2:
+        # Con una dimensión los puntos se ubican sobre y = 0
+        proyectar = lambda x: np.column_stack((np.asarray(x, dtype=float).reshape(-1, 1), np.zeros(np.size(x))))
+        etiquetas = ("Dimensión 1", "")
+    else:
+        proyectar = lambda x: np.asarray(x, dtype=float).reshape(-1, dimensiones)[:, :2]
+        etiquetas = ("Dimensión 1", "Dimensión 2")
+
+    # Primera pasada: límites de la rejilla
+    minimo = np.full(2, np.inf)
+    maximo = np.full(2, -np.inf)
+    for inicio in range(0, n, tamano_bloque):
+        bloque = proyectar(datos[inicio:inicio + tamano_bloque])
+        minimo = np.minimum(minimo, bloque.min(axis=0))
+        maximo = np.maximum(maximo, bloque.max(axis=0))
+
+    # Ampliar los ejes sin rango (datos constantes) para que la rejilla no sea singular
+    sin_rango = maximo <= minimo
+    minimo[sin_rango] -= 0.5
+    maximo[sin_rango] += 0.5
+
+    fig = Figure(figsize=tamano, dpi=dpi)
+    ax = fig.add_subplot()
+
+    if modo == 'histograma':
+        # Segunda pasada: acumular conteos en la rejilla
+        bordes_x = np.linspace(minimo[0], maximo[0], bins + 1)
+        bordes_y = np.linspace(minimo[1], maximo[1], bins + 1)
+        conteos = np.zeros((bins, bins))
+        for inicio in range(0, n, tamano_bloque):
+            bloque = proyectar(datos[inicio:inicio + tamano_bloque])
+            conteos += np.histogram2d(bloque[:, 0], bloque[:, 1], bins=(bordes_x, bordes_y))[0]
+
+        densidad = np.ma.masked_equal(conteos.T, 0)
+        imagen = ax.imshow(np.ma.log10(densidad), origin='lower', aspect='auto', cmap='Blues',
+                           extent=(bordes_x[0], bordes_x[-1], bordes_y[0], bordes_y[-1]))
+    else:
+        proyectados = proyectar(datos)
+        imagen = ax.hexbin(proyectados[:, 0], proyectados[:, 1], gridsize=bins, bins='log', cmap='Blues', mincnt=1,
+                           extent=(minimo[0], maximo[0], minimo[1], maximo[1]))
+    fig.colorbar(imagen, ax=ax, label='log10(conteo)')
+
+    # Dibujar los centros reales si están disponibles
+    if centros_reales is not None:
+        reales = proyectar(centros_reales)
+        ax.scatter(reales[:, 0], reales[:, 1], c='green', marker='x', label='Centros Reales', s=100)
+
+    # Dibujar los centros refinados y sus radios si están disponibles
+    if centros_refinados is not None and len(centros_refinados) > 0:
+        refinados = proyectar(centros_refinados)
+        ax.scatter(refinados[:, 0], refinados[:, 1], c='red', marker='o', label='Centros Refinados', s=100)
+        if sigmas_refinados is not None:
+            for centro, sigma in zip(refinados, sigmas_refinados):
+                ax.add_patch(Circle(centro, float(np.mean(sigma)), color='red', fill=False, linestyle='--', linewidth=1.5))
+
+    # Añadir leyenda sólo si se dibujó algún centro
+    if ax.get_legend_handles_labels()[0]:
+        ax.legend()
+    ax.set_title(titulo)
+    ax.set_xlabel(etiquetas[0])
+    ax.set_ylabel(etiquetas[1])
+
+    # Guardar sin abrir ventana
+    fig.savefig(archivo)
+
+    return archivo
@@ -0,0 +1,190 @@
+import copy
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from pyecsago.ea.deterministic_crowding import DeterministicCrowding
+from pyecsago.ea.haea import HAEA
+from pyecsago.ea.individual import GeneraIndividuo
+from pyecsago.ea.population import GeneraPoblacion
+
+
+# Parámetros que afectan la evolución y parámetros que sólo afectan la extracción de prototipos
+PARAMETROS_EVOLUCION = {
+    'num_individuos': 30,
+    'weight_threshold': 0.3,
+    'tasa_aprendizaje': None,
+    'sigma2': 0.05,
+    'num_generaciones': 10,
+}
+PARAMETROS_EXTRACCION = {
+    'umbral_fitness': 0.8,
+    'kmin': 0.1,
+    'iteraciones': 10,
+}
+
+# Datos compartidos dentro de cada proceso trabajador
+_memoria_compartida = None
+_datos_compartidos = None
+
+
+def _inicializar_trabajador(nombre, forma, tipo):
+    """Conecta el proceso trabajador a la copia compartida de los datos."""
+    global _memoria_compartida, _datos_compartidos
+    _memoria_compartida = shared_memory.SharedMemory(name=nombre)
+    _datos_compartidos = np.ndarray(forma, dtype=tipo, buffer=_memoria_compartida.buf)
+    _datos_compartidos.flags.writeable = False
+
+def _ejecutar_evolucion(config_evolucion, configs_extraccion, dimensiones, semilla, id_evolucion):
+    """
+    Ejecuta una evolución y todas las extracciones que comparten su configuración.
+
+    Retorna:
+    - filas (list): Una fila de resultados por cada configuración de extracción.
+    """
+    if semilla is not None:
+        np.random.seed(semilla)
+
+    inicio = time.perf_counter()
+    poblacion = GeneraPoblacion(
+        num_individuos=config_evolucion['num_individuos'],
+        individuo_class=GeneraIndividuo,
+        niching_strategy=DeterministicCrowding(),
+        operadores_strategy=HAEA(tasa_aprendizaje=config_evolucion['tasa_aprendizaje']),
+        datos=_datos_compartidos,
+        dimensiones=dimensiones,
+        weight_threshold=config_evolucion['weight_threshold'],
+        sigma2=config_evolucion['sigma2']
+    )
+    poblacion.evaluar_fitness_poblacion()
+    poblacion.evolucionar(num_generaciones=config_evolucion['num_generaciones'])
+    tiempo_evolucion = time.perf_counter() - inicio
+
+    filas = []
+    for config_extraccion in configs_extraccion:
+        inicio = time.perf_counter()
+        # Copiar los candidatos para que el refinamiento no altere la población compartida entre extracciones
+        prototipos = [copy.deepcopy(p) for p in poblacion.extraer_prototipos(config_extraccion['umbral_fitness'], config_extraccion['kmin'])]
+        prototipos = poblacion.refinar_prototipos(prototipos, config_extraccion['iteraciones'], config_extraccion['kmin'])
+        tiempo_extraccion = time.perf_counter() - inicio
+
+        filas.append({
+            **config_evolucion,
+            **config_extraccion,
+            # Con tasa_aprendizaje=None HAEA sortea la tasa; se registra la usada realmente
+            'tasa_aprendizaje': poblacion.operadores_strategy.tasa_aprendizaje,
+            'id_evolucion': id_evolucion,
+            'semilla': semilla,
+            'num_prototipos': len(prototipos),
+            'mejor_fitness': max((ind.fitness for ind in poblacion.individuos), default=np.nan),
+            'tiempo_evolucion': tiempo_evolucion,
+            'tiempo_extraccion': tiempo_extraccion,
+        })
+
+    return filas
+
+def generar_configuraciones(espacio, modo='grid', num_muestras=10, semilla=None):
+    """
+    Genera las configuraciones a evaluar a partir de un espacio de búsqueda.
+
+    Parámetros:
+    - espacio (dict): Nombre del parámetro -> lista de valores. En modo 'aleatorio' también se acepta
+      una tupla (minimo, maximo) para muestrear uniformemente; si ambos límites son enteros se muestrea
+      un entero en [minimo, maximo].
+    - modo (str): 'grid' para el producto cartesiano o 'aleatorio' para muestreo aleatorio.
+    - num_muestras (int): Número de configuraciones en modo 'aleatorio'.
+    - semilla (int): Semilla para el muestreo aleatorio (opcional).
+
+    Retorna:
+    - configuraciones (list): Lista de diccionarios con los parámetros completos.
+    """
+    desconocidos = set(espacio) - set(PARAMETROS_EVOLUCION) - set(PARAMETROS_EXTRACCION)
+    if desconocidos:
+        raise ValueError(f"Parámetros no soportados en el espacio de búsqueda: {sorted(desconocidos)}")
+
+    nombres = list(espacio)
+    if modo == 'grid':
+        combinaciones = [dict(zip(nombres, valores)) for valores in itertools.product(*(espacio[n] for n in nombres))]
+    elif modo == 'aleatorio':
+        rng = np.random.default_rng(semilla)
+        combinaciones = []
+        for _ in range(num_muestras):
+            combinacion = {}
+            for nombre in nombres:
+                valores = espacio[nombre]
+                if isinstance(valores, tuple) and all(isinstance(v, (int, np.integer)) for v in valores):
+                    combinacion[nombre] = int(rng.integers(valores[0], valores[1], endpoint=True))
+                elif isinstance(valores, tuple):
+                    combinacion[nombre] = float(rng.uniform(valores[0], valores[1]))
+                else:
+                    combinacion[nombre] = valores[rng.integers(len(valores))]
+            combinaciones.append(combinacion)
+    else:
+        raise ValueError(f"Modo de búsqueda no soportado: {modo}")
+
+    return [{**PARAMETROS_EVOLUCION, **PARAMETROS_EXTRACCION, **combinacion} for combinacion in combinaciones]
+
+def ejecutar_barrido(datos, espacio, dimensiones=None, modo='grid', num_muestras=10, max_procesos=None, semilla=None):
+    """
+    Ejecuta un barrido de hiperparámetros en paralelo sobre una única copia compartida de los datos.
+
+    Las configuraciones que sólo difieren en parámetros de extracción (umbral_fitness, kmin, iteraciones)
+    reutilizan la misma evolución.
+
+    Parámetros:
+    - datos (np.array): Puntos de datos (n, dimensiones).
+    - espacio (dict): Espacio de búsqueda (ver `generar_configuraciones`).
+    - dimensiones (int): Dimensiones del genoma (por defecto las de los datos).
+    - modo (str): 'grid' o 'aleatorio'.
+    - num_muestras (int): Número de configuraciones en modo 'aleatorio'.
+    - max_procesos (int): Número máximo de procesos (por defecto el número de CPUs).
+    - semilla (int): Semilla base; cada evolución usa `semilla + índice` (opcional).
+
+    Retorna:
+    - resultados (pd.DataFrame): Una fila por configuración con tiempos y número de prototipos. Las filas con el
+      mismo `id_evolucion` comparten la misma evolución. `tasa_aprendizaje` es la tasa usada por HAEA, también
+      cuando se sorteó al azar por no especificarse.
+    """
+    datos = np.ascontiguousarray(datos)
+    dimensiones = datos.shape[1] if dimensiones is None else dimensiones
+    configuraciones = generar_configuraciones(espacio, modo=modo, num_muestras=num_muestras, semilla=semilla)
+
+    # Agrupar las configuraciones por parámetros de evolución
+    grupos = {}
+    for config in configuraciones:
+        clave = tuple(config[nombre] for nombre in PARAMETROS_EVOLUCION)
+        config_extraccion = {nombre: config[nombre] for nombre in PARAMETROS_EXTRACCION}
+        if config_extraccion not in grupos.setdefault(clave, []):
+            grupos[clave].append(config_extraccion)
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(datos.nbytes, 1))
+    try:
+        compartidos = np.ndarray(datos.shape, dtype=datos.dtype, buffer=memoria.buf)
+        compartidos[:] = datos
+        # Liberar la vista local para poder cerrar la memoria compartida al terminar
+        del compartidos
+
+        with ProcessPoolExecutor(max_workers=max_procesos, initializer=_inicializar_trabajador,
+                                 initargs=(memoria.name, datos.shape, datos.dtype)) as ejecutor:
+            futuros = [
+                ejecutor.submit(
+                    _ejecutar_evolucion,
+                    dict(zip(PARAMETROS_EVOLUCION, clave)),
+                    configs_extraccion,
+                    dimensiones,
+                    None if semilla is None else semilla + i,
+                    i
+                )
+                for i, (clave, configs_extraccion) in enumerate(grupos.items())
+            ]
+            filas = [fila for futuro in futuros for fila in futuro.result()]
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+    return pd.DataFrame(filas)
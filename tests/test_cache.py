@@ -0,0 +1,99 @@
+import copy
+import unittest
+
+import numpy as np
+
+from pyecsago.ea.cache import CacheDistancias
+from pyecsago.ea.deterministic_crowding import DeterministicCrowding
+from pyecsago.ea.haea import HAEA
+from pyecsago.ea.individual import GeneraIndividuo
+from pyecsago.ea.population import GeneraPoblacion
+from pyecsago.utils.data import generar_datos_sinteticos
+
+
+def distancias2_exactas(datos, genoma):
+    return np.sum((datos - genoma) ** 2, axis=1)
+
+
+class TestCacheDistancias(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.datos = self.rng.random((400, 100))
+
+    def test_mutaciones_dispersas_sin_deriva(self):
+        # Muchas mutaciones de pocos genes deben coincidir con la distancia exacta
+        cache = CacheDistancias(recalcular_cada=10 ** 6)
+        individuo = GeneraIndividuo(genoma=self.rng.random(100))
+        cache.distancias2(individuo, self.datos)
+
+        for _ in range(500):
+            genes = self.rng.choice(100, size=3, replace=False)
+            individuo.genoma[genes] += self.rng.normal(0, 0.1, size=3)
+            distancias2 = cache.distancias2(individuo, self.datos)
+            np.testing.assert_allclose(distancias2, distancias2_exactas(self.datos, individuo.genoma), rtol=0, atol=1e-9)
+
+        self.assertEqual(cache.estadisticas['evaluaciones_completas'], 1)
+        self.assertEqual(cache.estadisticas['actualizaciones_delta'], 500)
+
+    def test_copia_mutada_parte_del_padre(self):
+        # Una copia mutada del padre se actualiza de forma incremental a partir de las distancias del padre
+        cache = CacheDistancias()
+        padre = GeneraIndividuo(genoma=self.rng.random(100))
+        distancias2_padre = cache.distancias2(padre, self.datos).copy()
+
+        hijo = HAEA._copiar(padre)
+        hijo.genoma[[4, 50]] += 0.5
+        distancias2 = cache.distancias2(hijo, self.datos, origen=padre)
+
+        np.testing.assert_allclose(distancias2, distancias2_exactas(self.datos, hijo.genoma), rtol=0, atol=1e-9)
+        np.testing.assert_array_equal(cache.distancias2(padre, self.datos), distancias2_padre)
+        self.assertEqual(cache.estadisticas['actualizaciones_delta'], 1)
+
+    def test_presupuesto_de_memoria(self):
+        # Con un presupuesto de tres entradas se desaloja y la memoria nunca supera el límite
+        tamano_entrada = self.datos.shape[0] * 8 + self.datos.shape[1] * 8
+        cache = CacheDistancias(memoria_maxima=3 * tamano_entrada)
+        individuos = [GeneraIndividuo(genoma=self.rng.random(100)) for _ in range(10)]
+
+        for individuo in individuos:
+            cache.distancias2(individuo, self.datos)
+            self.assertLessEqual(cache.memoria_usada, cache.memoria_maxima)
+
+        self.assertEqual(cache.estadisticas['desalojos'], 7)
+
+    def test_datos_distintos_misma_longitud(self):
+        # Otro conjunto de datos de igual tamaño invalida las distancias guardadas
+        cache = CacheDistancias()
+        individuo = GeneraIndividuo(genoma=self.rng.random(100))
+        cache.distancias2(individuo, self.datos)
+
+        otros_datos = self.rng.random(self.datos.shape)
+        np.testing.assert_allclose(cache.distancias2(individuo, otros_datos), distancias2_exactas(otros_datos, individuo.genoma))
+
+    def test_copias_profundas_no_colisionan(self):
+        # Una copia profunda es otro individuo para el cache
+        cache = CacheDistancias()
+        individuo = GeneraIndividuo(genoma=self.rng.random(100))
+        cache.distancias2(individuo, self.datos)
+
+        copia = copy.deepcopy(individuo)
+        copia.genoma[:] = self.rng.random(100)
+        np.testing.assert_allclose(cache.distancias2(copia, self.datos), distancias2_exactas(self.datos, copia.genoma))
+        np.testing.assert_allclose(cache.distancias2(individuo, self.datos), distancias2_exactas(self.datos, individuo.genoma))
+
+    def test_evolucion_con_cache(self):
+        # Durante la evolución las copias mutadas usan actualizaciones incrementales
+        np.random.seed(1)
+        datos, _ = generar_datos_sinteticos(num_clusters=3, puntos_por_cluster=50, dimensiones=20, semilla=1)
+        cache = CacheDistancias()
+        poblacion = GeneraPoblacion(20, GeneraIndividuo, DeterministicCrowding(), HAEA(tasa_aprendizaje=0.1), datos, 20, 0.3,
+                                    sigma2=0.05, cache_distancias=cache)
+        poblacion.evaluar_fitness_poblacion()
+        poblacion.evolucionar(5)
+
+        self.assertGreater(cache.estadisticas['actualizaciones_delta'], 0)
+        self.assertEqual(poblacion.generaciones, 5)
+
+if __name__ == '__main__':
+    unittest.main()
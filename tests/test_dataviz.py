@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+import warnings
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+from pyecsago.utils.data import generar_datos_sinteticos
+from pyecsago.utils.funcs import visualizar_resultados_densidad
+
+
+class TestVisualizacionDensidad(unittest.TestCase):
+
+    def setUp(self):
+        self.datos, self.centros_reales = generar_datos_sinteticos(num_clusters=3, puntos_por_cluster=200, dimensiones=5, semilla=0)
+        self.directorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_png_datos_multidimensionales(self):
+        # Datos de más de 2 dimensiones se proyectan con PCA y se guardan en PNG
+        archivo = os.path.join(self.directorio.name, 'densidad.png')
+        resultado = visualizar_resultados_densidad(self.datos, archivo, centros_reales=self.centros_reales,
+                                                   centros_refinados=self.centros_reales[:2], sigmas_refinados=np.array([0.05, 0.05]),
+                                                   bins=32, tamano_bloque=100)
+        self.assertEqual(resultado, archivo)
+        self.assertTrue(os.path.exists(archivo), "Debería generarse el archivo PNG")
+        self.assertGreater(os.path.getsize(archivo), 0)
+
+    def test_sin_centros_sin_advertencias(self):
+        # Sin centros no hay leyenda ni advertencias de matplotlib
+        for modo, extension in [('histograma', 'svg'), ('hexbin', 'png')]:
+            archivo = os.path.join(self.directorio.name, f'{modo}.{extension}')
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                visualizar_resultados_densidad(self.datos, archivo, modo=modo, bins=16)
+            self.assertTrue(os.path.exists(archivo))
+
+    def test_datos_unidimensionales(self):
+        # Datos de una dimensión se dibujan sobre el eje horizontal, con sus centros
+        datos = self.datos[:, :1]
+        for modo in ('histograma', 'hexbin'):
+            archivo = os.path.join(self.directorio.name, f'{modo}_1d.png')
+            visualizar_resultados_densidad(datos, archivo, centros_reales=self.centros_reales[:, :1], modo=modo,
+                                           bins=16, tamano_bloque=100)
+            self.assertTrue(os.path.exists(archivo))
+
+    def test_datos_constantes(self):
+        # Datos sin rango en algún eje no producen límites singulares
+        for datos in (np.ones((50, 2)), np.column_stack((np.linspace(0, 1, 50), np.zeros(50)))):
+            for modo in ('histograma', 'hexbin'):
+                archivo = os.path.join(self.directorio.name, f'{modo}_constante.png')
+                with warnings.catch_warnings():
+                    warnings.simplefilter('error')
+                    visualizar_resultados_densidad(datos, archivo, modo=modo, bins=16)
+                self.assertTrue(os.path.exists(archivo))
+
+if __name__ == '__main__':
+    unittest.main()
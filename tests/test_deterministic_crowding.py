@@ -0,0 +1,104 @@
+import unittest
+
+import numpy as np
+
+from pyecsago.ea.deterministic_crowding import DeterministicCrowding
+from pyecsago.ea.haea import HAEA
+from pyecsago.ea.individual import GeneraIndividuo
+from pyecsago.ea.population import GeneraPoblacion
+from pyecsago.utils.data import generar_datos_sinteticos
+
+
+def individuo_con_fitness(genoma, fitness):
+    individuo = GeneraIndividuo(genoma=np.array(genoma, dtype=float))
+    individuo.fitness = fitness
+    return individuo
+
+
+class TestApareamientoRestringido(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        # Individuos sobre una recta con separaciones crecientes, para que los vecinos sean únicos
+        self.posiciones = np.cumsum(np.arange(1, 21)) / 10
+        self.individuos = [individuo_con_fitness([x, 0.0], fitness=1.0) for x in self.posiciones]
+
+    def test_k_vecinos_invalido(self):
+        for k in (0, -1):
+            with self.assertRaises(ValueError):
+                DeterministicCrowding(k_vecinos=k)
+
+    def test_pareja_entre_k_mas_cercanos(self):
+        # Cada individuo participa en una sola pareja por generación, y la pareja del primer padre está
+        # entre sus k genomas más cercanos que aún no tenían pareja
+        k = 3
+        estrategia = DeterministicCrowding(k_vecinos=k)
+        for _ in range(20):
+            sin_pareja = set(range(len(self.individuos)))
+            for _ in range(len(self.individuos) // 2):
+                padre1, padre2 = estrategia.seleccionar_padres(self.individuos)
+                i, j = self.individuos.index(padre1), self.individuos.index(padre2)
+                self.assertIn(i, sin_pareja)
+                self.assertIn(j, sin_pareja)
+                sin_pareja -= {i, j}
+
+                distancias = sorted(abs(self.posiciones[m] - self.posiciones[i]) for m in sin_pareja)
+                self.assertLessEqual(abs(self.posiciones[j] - self.posiciones[i]), distancias[k - 1] if len(distancias) >= k else np.inf)
+            self.assertEqual(sin_pareja, set())
+
+    def test_reemplazo_actualiza_indice(self):
+        # Los hijos que ganan ocupan en el índice las posiciones de sus padres y pueden ser seleccionados
+        estrategia = DeterministicCrowding(k_vecinos=2)
+        padre1, padre2 = estrategia.seleccionar_padres(self.individuos)
+        hijos = [individuo_con_fitness(padre1.genoma + [0.0, 0.01], fitness=5.0),
+                 individuo_con_fitness(padre2.genoma + [0.0, 0.01], fitness=5.0)]
+
+        sobrevivientes = estrategia.reemplazar([padre1, padre2], hijos)
+        self.assertEqual([id(s) for s in sobrevivientes], [id(h) for h in hijos])
+
+        seleccionados = set()
+        for _ in range(500):
+            seleccionados.update(id(p) for p in estrategia.seleccionar_padres(self.individuos))
+        self.assertTrue({id(h) for h in hijos} <= seleccionados, "Los hijos sobrevivientes deberían poder seleccionarse")
+        self.assertFalse({id(padre1), id(padre2)} & seleccionados, "Los padres reemplazados ya no deberían seleccionarse")
+
+        # Una nueva lista de población reconstruye el índice
+        padre1, padre2 = estrategia.seleccionar_padres(list(self.individuos))
+        self.assertIn(padre1, self.individuos)
+
+    def test_rival_padre_mas_cercano(self):
+        # El hijo compite con el padre más cercano genéticamente, y reemplazar usa la misma regla
+        estrategia = DeterministicCrowding()
+        padre1, padre2 = self.individuos[0], self.individuos[10]
+        hijo = individuo_con_fitness(padre2.genoma + [0.1, 0.0], fitness=0.5)
+        self.assertIs(estrategia.rival(hijo, padre1, padre2), padre2)
+        self.assertIs(estrategia.rival(hijo, padre2, padre1), padre2)
+
+        otro_hijo = individuo_con_fitness(padre1.genoma, fitness=0.5)
+        self.assertEqual(estrategia.reemplazar([padre1, padre2], [hijo, otro_hijo]), [padre2, padre1])
+
+    def test_preserva_nichos(self):
+        # Con apareamiento restringido la población final cubre más clusters que con apareamiento aleatorio
+        def clusters_cubiertos(k_vecinos, semilla):
+            np.random.seed(semilla)
+            datos, centros = generar_datos_sinteticos(num_clusters=6, puntos_por_cluster=20, dimensiones=2, semilla=semilla)
+            poblacion = GeneraPoblacion(30, GeneraIndividuo, DeterministicCrowding(k_vecinos=k_vecinos), HAEA(tasa_aprendizaje=0.1), datos, 2, 0.3, sigma2=0.05)
+            poblacion.evaluar_fitness_poblacion()
+            poblacion.evolucionar(10)
+            genomas = np.array([individuo.genoma for individuo in poblacion.individuos])
+            distancias = np.linalg.norm(centros[:, None] - genomas[None], axis=2)
+            return np.sum(distancias.min(axis=1) < 0.1)
+
+        aleatorio = np.mean([clusters_cubiertos(None, semilla) for semilla in range(5)])
+        restringido = np.mean([clusters_cubiertos(3, semilla) for semilla in range(5)])
+        self.assertGreater(restringido, aleatorio)
+        self.assertGreaterEqual(restringido, 4)
+
+    def test_sin_restriccion(self):
+        # Sin k_vecinos los padres se eligen al azar entre toda la población
+        estrategia = DeterministicCrowding()
+        padre1, padre2 = estrategia.seleccionar_padres(self.individuos)
+        self.assertIsNot(padre1, padre2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+
+from pyecsago.ea.deterministic_crowding import DeterministicCrowding
+from pyecsago.ea.haea import HAEA
+from pyecsago.ea.individual import GeneraIndividuo
+from pyecsago.ea.population import GeneraPoblacion
+from pyecsago.utils.data import generar_datos_sinteticos
+
+
+class TestMultiFidelidad(unittest.TestCase):
+
+    def crear_poblacion(self, **kwargs):
+        np.random.seed(7)
+        datos, _ = generar_datos_sinteticos(num_clusters=4, puntos_por_cluster=50, dimensiones=2, semilla=7)
+        poblacion = GeneraPoblacion(20, GeneraIndividuo, DeterministicCrowding(), HAEA(tasa_aprendizaje=0.1), datos, 2, 0.3, sigma2=0.05, **kwargs)
+        poblacion.evaluar_fitness_poblacion()
+        return poblacion
+
+    def test_programa_geometrico(self):
+        # La muestra crece geométricamente y las últimas generaciones usan todos los datos
+        poblacion = self.crear_poblacion(fidelidad_inicial=0.1, factor_fidelidad=2)
+        programa = poblacion.programa_fidelidad(10)
+        self.assertEqual(programa[0], 20)
+        self.assertEqual(programa[-1], 200)
+        self.assertEqual(programa, sorted(programa))
+        self.assertEqual(sorted(set(programa)), [20, 40, 80, 160, 200])
+
+    def test_parametros_invalidos(self):
+        # Un factor <= 1 nunca alcanzaría todos los datos, y una fidelidad inicial <= 0 no tiene sentido
+        for kwargs in ({'fidelidad_inicial': 0.1, 'factor_fidelidad': 1}, {'fidelidad_inicial': 0.1, 'factor_fidelidad': 0.5},
+                       {'fidelidad_inicial': 0}, {'fidelidad_inicial': -0.2}):
+            with self.assertRaises(ValueError):
+                self.crear_poblacion(**kwargs)
+
+    def test_muestra_estratificada_anidada(self):
+        # Para cualquier par de tamaños, y en cualquier orden de llamada, la muestra mayor contiene a la menor
+        # (con estratos de distinto tamaño, donde el redondeo de las cuotas cambia entre tamaños)
+        poblacion = self.crear_poblacion(fidelidad_inicial=0.1, estratos=12)
+        tamanos = list(range(1, 200))
+        np.random.shuffle(tamanos)
+        muestras = {tamano: poblacion._muestra_estratificada(tamano) for tamano in tamanos}
+
+        anterior = set()
+        for tamano in range(1, 200):
+            puntos = {tuple(punto) for punto in muestras[tamano]}
+            self.assertEqual(len(muestras[tamano]), tamano)
+            self.assertTrue(anterior <= puntos, f"La muestra de {tamano} puntos debería contener a la de {tamano - 1}")
+            anterior = puntos
+
+    def test_muestra_estratificada_proporcional(self):
+        # Con estratos de igual tamaño, cada estrato aporta su cuota proporcional con un error de a lo sumo un punto
+        poblacion = self.crear_poblacion(fidelidad_inicial=0.1, estratos=4)
+        datos = poblacion.datos
+        eje = np.linalg.eigh(np.cov(datos, rowvar=False))[1][:, -1]
+        proyeccion = (datos - np.mean(datos, axis=0)) @ eje
+        bordes = np.quantile(proyeccion, [0.25, 0.5, 0.75])
+        etiquetas = {tuple(punto): estrato for punto, estrato in zip(datos, np.digitize(proyeccion, bordes))}
+        tamanos_estratos = np.bincount(list(etiquetas.values()), minlength=4)
+
+        for tamano in (7, 30, 55, 120, 199):
+            conteos = np.bincount([etiquetas[tuple(punto)] for punto in poblacion._muestra_estratificada(tamano)], minlength=4)
+            np.testing.assert_array_less(np.abs(conteos - tamano * tamanos_estratos / len(datos)), 1 + 1e-9)
+
+    def test_puntos_evaluados_frente_a_fidelidad_completa(self):
+        # La referencia de fidelidad completa coincide con lo que evalúa una ejecución real con todos los datos
+        completa = self.crear_poblacion()
+        completa.evolucionar(10)
+
+        multifidelidad = self.crear_poblacion(fidelidad_inicial=0.1)
+        multifidelidad.evolucionar(10)
+
+        estadisticas = multifidelidad.estadisticas_fidelidad
+        self.assertEqual(estadisticas['puntos_fidelidad_completa'], completa.estadisticas_fidelidad['puntos_evaluados'])
+        self.assertEqual(estadisticas['puntos_reevaluacion'], 20 * (20 + 40 + 80 + 160 + 200))
+        self.assertLess(estadisticas['puntos_evaluados'], estadisticas['puntos_fidelidad_completa'])
+        self.assertEqual(len(multifidelidad._datos_evaluacion), 200)
+
+    def test_programa_no_reinicia(self):
+        # Tras una ejecución completa, una nueva llamada a evolucionar sigue usando todos los datos
+        poblacion = self.crear_poblacion(fidelidad_inicial=0.1)
+        poblacion.evolucionar(10)
+        reevaluacion = poblacion.estadisticas_fidelidad['puntos_reevaluacion']
+
+        self.assertEqual(poblacion.programa_fidelidad(5), [200] * 5)
+        poblacion.evolucionar(5)
+        self.assertEqual(poblacion.estadisticas_fidelidad['puntos_reevaluacion'], reevaluacion)
+        self.assertEqual(len(poblacion._datos_evaluacion), 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,29 +1,32 @@
 import unittest
 import numpy as np
 
-from pyecsago.ea.ecsago import IndividuoConcreto, PoblacionConcreta, HAEA, DeterministicCrowding, generar_datos_sinteticos
+from pyecsago.ea.deterministic_crowding import DeterministicCrowding
+from pyecsago.ea.haea import HAEA
+from pyecsago.ea.individual import GeneraIndividuo
+from pyecsago.ea.population import GeneraPoblacion
+from pyecsago.utils.data import generar_datos_sinteticos
 
 class TestECSAGO(unittest.TestCase):
 
     def setUp(self):
         # Generar datos sintéticos
         self.datos_sinteticos, self.centros_reales = generar_datos_sinteticos(num_clusters=5, puntos_por_cluster=50, dimensiones=2, semilla=42)
-        self.poblacion = PoblacionConcreta(
+        self.poblacion = GeneraPoblacion(
             num_individuos=30,
-            individuo_class=IndividuoConcreto,
+            individuo_class=GeneraIndividuo,
             niching_strategy=DeterministicCrowding(),
             operadores_strategy=HAEA(),
             datos=self.datos_sinteticos,
             dimensiones=2,
-            weight_treshold=0.3,
-            tasa_mutacion=0.1,
-            tasa_cruce=0.7,
+            weight_threshold=0.3,
             sigma2=0.05
         )
+        self.poblacion.evaluar_fitness_poblacion()
 
     def test_calculo_fitness(self):
-        # Verificar que el fitness se calcula correctamente para un individuo
-        individuo = self.poblacion.individuos[0]
+        # Verificar que el fitness se calcula correctamente para un individuo ubicado en un cluster
+        individuo = GeneraIndividuo(genoma=self.centros_reales[0], sigma2=0.05)
         fitness = individuo.calcular_fitness(self.datos_sinteticos, 0.3)
         self.assertGreater(fitness, 0, "El fitness debería ser mayor que 0")
 
@@ -34,8 +37,8 @@ class TestECSAGO(unittest.TestCase):
         self.poblacion.operadores_strategy.mutar(hijo1)
         self.poblacion.operadores_strategy.mutar(hijo2)
         
-        self.assertIsInstance(hijo1, IndividuoConcreto, "Hijo1 debería ser un IndividuoConcreto")
-        self.assertIsInstance(hijo2, IndividuoConcreto, "Hijo2 debería ser un IndividuoConcreto")
+        self.assertIsInstance(hijo1, GeneraIndividuo, "Hijo1 debería ser un GeneraIndividuo")
+        self.assertIsInstance(hijo2, GeneraIndividuo, "Hijo2 debería ser un GeneraIndividuo")
 
     def test_evolucion_poblacion(self):
         # Verificar la evolución de la población
@@ -0,0 +1,46 @@
+import copy
+import unittest
+
+import numpy as np
+
+from pyecsago.ea.deterministic_crowding import DeterministicCrowding
+from pyecsago.ea.haea import HAEA
+from pyecsago.ea.individual import GeneraIndividuo
+from pyecsago.ea.population import GeneraPoblacion
+from pyecsago.utils.data import generar_datos_sinteticos
+
+
+class TestRefinamientoAcelerado(unittest.TestCase):
+
+    def crear_poblacion(self, semilla):
+        datos, centros = generar_datos_sinteticos(num_clusters=8, puntos_por_cluster=150, dimensiones=3, semilla=semilla)
+        poblacion = GeneraPoblacion(10, GeneraIndividuo, DeterministicCrowding(), HAEA(tasa_aprendizaje=0.1), datos, 3, 0.3, sigma2=0.05)
+        # Prototipos iniciales cerca (pero no encima) de los centros reales
+        prototipos = [GeneraIndividuo(genoma=centro + np.random.normal(0, 0.05, size=3), sigma2=0.05) for centro in centros]
+        return poblacion, prototipos
+
+    def test_mismo_resultado_que_exacto(self):
+        # El refinamiento acelerado produce los mismos prototipos que el exacto y omite distancias
+        for semilla in range(5):
+            poblacion, prototipos = self.crear_poblacion(semilla)
+            exactos = poblacion.refinar_prototipos(copy.deepcopy(prototipos), iteraciones=10, kmin=0.01)
+            estadisticas_exacto = poblacion.estadisticas_refinamiento
+            acelerados = poblacion.refinar_prototipos(copy.deepcopy(prototipos), iteraciones=10, kmin=0.01, acelerado=True)
+            estadisticas = poblacion.estadisticas_refinamiento
+
+            for exacto, acelerado in zip(exactos, acelerados):
+                np.testing.assert_array_equal(exacto.genoma, acelerado.genoma)
+                np.testing.assert_array_equal(exacto.sigma2, acelerado.sigma2)
+
+            total = estadisticas['distancias_calculadas'] + estadisticas['distancias_omitidas']
+            self.assertEqual(total, estadisticas_exacto['distancias_calculadas'])
+            self.assertGreater(estadisticas['distancias_omitidas'], 0)
+            self.assertLessEqual(estadisticas['distancias_calculadas'], estadisticas_exacto['distancias_calculadas'])
+
+    def test_sin_prototipos(self):
+        poblacion, _ = self.crear_poblacion(0)
+        self.assertEqual(poblacion.refinar_prototipos([], iteraciones=3, acelerado=True), [])
+        self.assertEqual(poblacion.estadisticas_refinamiento['distancias_omitidas'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+
+import numpy as np
+
+from pyecsago.ea.deterministic_crowding import DeterministicCrowding
+from pyecsago.ea.haea import HAEA
+from pyecsago.ea.individual import GeneraIndividuo
+from pyecsago.ea.population import GeneraPoblacion
+from pyecsago.ea.surrogate import ModeloSustituto
+from pyecsago.utils.data import generar_datos_sinteticos
+
+
+def individuo_con_fitness(genoma, fitness):
+    individuo = GeneraIndividuo(genoma=np.array(genoma, dtype=float))
+    individuo.fitness = fitness
+    return individuo
+
+
+class TestModeloSustituto(unittest.TestCase):
+
+    def setUp(self):
+        self.modelo = ModeloSustituto(k_vecinos=3, tamano_archivo=50, tasa_exploracion=0.0)
+        for x in np.linspace(0, 1, 11):
+            self.modelo.agregar(individuo_con_fitness([x, 0.0], fitness=10 * x))
+
+    def test_prediccion_vecinos(self):
+        # La predicción interpola el fitness de los vecinos archivados
+        self.assertAlmostEqual(self.modelo.predecir(np.array([0.5, 0.0])), 5.0, places=6)
+        self.assertIsNone(ModeloSustituto(k_vecinos=3).predecir(np.zeros(2)))
+
+    def test_decision_y_conteos(self):
+        # Un hijo que no mejoraría a su padre se omite; con exploración se evalúa y se marca como tal
+        hijo = individuo_con_fitness([0.1, 0.0], fitness=0)
+        padre = individuo_con_fitness([0.1, 0.0], fitness=8.0)
+        evaluar, prediccion, exploracion = self.modelo.debe_evaluar(hijo, padre)
+        self.assertEqual((evaluar, exploracion), (False, False))
+        self.assertEqual(self.modelo.evaluaciones_omitidas, 1)
+
+        self.modelo.tasa_exploracion = 1.0
+        evaluar, prediccion, exploracion = self.modelo.debe_evaluar(hijo, padre)
+        self.assertEqual((evaluar, exploracion), (True, True))
+        self.assertEqual(self.modelo.evaluaciones_reales, 1)
+
+        padre_debil = individuo_con_fitness([0.9, 0.0], fitness=0.0)
+        evaluar, _, exploracion = self.modelo.debe_evaluar(individuo_con_fitness([0.9, 0.0], 0), padre_debil)
+        self.assertEqual((evaluar, exploracion), (True, False))
+
+    def test_cota_optimista(self):
+        # La media ponderada (5) no supera al padre (6), pero la cota con el rango de los vecinos (5 + 2) sí
+        hijo = individuo_con_fitness([0.5, 0.0], fitness=0)
+        padre = individuo_con_fitness([0.5, 0.0], fitness=6.0)
+        evaluar, prediccion, _ = self.modelo.debe_evaluar(hijo, padre)
+        self.assertTrue(evaluar)
+        self.assertAlmostEqual(prediccion, 5.0, places=6)
+
+        self.modelo.optimismo = 0.0
+        evaluar, _, _ = self.modelo.debe_evaluar(hijo, padre)
+        self.assertFalse(evaluar)
+
+    def test_reporte_fallos_por_exploracion(self):
+        # La tasa de fallos se calcula sólo sobre las evaluaciones por exploración
+        self.modelo.evaluaciones_omitidas = 100
+        self.modelo.registrar(5.0, 6.0, 4.0)                    # predijo mejora y mejoró
+        self.modelo.registrar(5.0, 3.0, 4.0)                    # predijo mejora y no mejoró
+        self.modelo.registrar(1.0, 6.0, 4.0, exploracion=True)  # predijo no mejora y sí mejoró
+        self.modelo.registrar(1.0, 2.0, 4.0, exploracion=True)
+        self.modelo.registrar(1.0, 2.0, 4.0, exploracion=True)
+        self.modelo.registrar(1.0, 2.0, 4.0, exploracion=True)
+
+        reporte = self.modelo.reporte()
+        self.assertEqual(reporte['evaluaciones_exploracion'], 4)
+        self.assertAlmostEqual(reporte['precision_mejora'], 0.5)
+        self.assertAlmostEqual(reporte['tasa_fallos_exploracion'], 0.25)
+        self.assertAlmostEqual(reporte['mejoras_perdidas_estimadas'], 25.0)
+
+    def test_evolucion_con_modelo(self):
+        # Los hijos omitidos no entran a la población ni ajustan las tasas de los operadores
+        np.random.seed(3)
+        datos, _ = generar_datos_sinteticos(num_clusters=4, puntos_por_cluster=40, dimensiones=2, semilla=3)
+        modelo = ModeloSustituto(k_vecinos=3, tasa_exploracion=0.2)
+        haea = HAEA(tasa_aprendizaje=0.1)
+        ajustes = []
+        ajustar_tasas = haea.ajustar_tasas
+        haea.ajustar_tasas = lambda individuo, recompensa=True: ajustes.append(recompensa) or ajustar_tasas(individuo, recompensa)
+
+        # El rival de cada hijo lo decide la estrategia de niching
+        niching = DeterministicCrowding()
+        rivales = []
+        rival = niching.rival
+        niching.rival = lambda hijo, padre, otro_padre: rivales.append(hijo) or rival(hijo, padre, otro_padre)
+
+        poblacion = GeneraPoblacion(20, GeneraIndividuo, niching, haea, datos, 2, 0.3, sigma2=0.05, modelo_sustituto=modelo)
+        poblacion.evaluar_fitness_poblacion()
+        poblacion.evolucionar(10)
+
+        self.assertGreater(modelo.evaluaciones_omitidas, 0)
+        self.assertEqual(modelo.evaluaciones_omitidas + modelo.evaluaciones_reales, 10 * 20)
+        self.assertEqual(len(ajustes), modelo.evaluaciones_reales)
+        # Una consulta por decisión del modelo y otra por hijo en el reemplazo
+        self.assertEqual(len(rivales), modelo.evaluaciones_omitidas + modelo.evaluaciones_reales + 10 * 20)
+        self.assertTrue(all(np.isfinite(individuo.fitness) for individuo in poblacion.individuos))
+
+    def test_optimismo_reduce_mejoras_perdidas(self):
+        # Con la cota optimista, los hijos que el modelo descartaría rara vez mejoran a su padre
+        reportes = {}
+        for optimismo in (0.0, 1.0):
+            np.random.seed(5)
+            datos, _ = generar_datos_sinteticos(num_clusters=6, puntos_por_cluster=60, dimensiones=2, semilla=5)
+            modelo = ModeloSustituto(k_vecinos=5, tasa_exploracion=0.5, optimismo=optimismo)
+            poblacion = GeneraPoblacion(30, GeneraIndividuo, DeterministicCrowding(), HAEA(tasa_aprendizaje=0.1), datos, 2, 0.3, sigma2=0.05, modelo_sustituto=modelo)
+            poblacion.evaluar_fitness_poblacion()
+            poblacion.evolucionar(15)
+            reportes[optimismo] = modelo.reporte()
+
+        self.assertLess(reportes[1.0]['tasa_fallos_exploracion'], 0.1)
+        self.assertLess(reportes[1.0]['tasa_fallos_exploracion'], reportes[0.0]['tasa_fallos_exploracion'])
+        self.assertLess(reportes[1.0]['mejoras_perdidas_estimadas'], reportes[0.0]['mejoras_perdidas_estimadas'])
+
+if __name__ == '__main__':
+    unittest.main()
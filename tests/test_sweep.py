@@ -0,0 +1,43 @@
+import unittest
+
+from pyecsago.utils.data import generar_datos_sinteticos
+from pyecsago.utils.sweep import ejecutar_barrido, generar_configuraciones
+
+
+class TestBarrido(unittest.TestCase):
+
+    def setUp(self):
+        self.datos, _ = generar_datos_sinteticos(num_clusters=3, puntos_por_cluster=30, dimensiones=2, semilla=0)
+
+    def test_barrido_grid(self):
+        # Un grid pequeño debe ejecutarse completo y retornar una fila por configuración
+        espacio = {'num_individuos': [8, 10], 'kmin': [0.1, 0.2], 'umbral_fitness': [0.5, 0.8], 'num_generaciones': [2]}
+        resultados = ejecutar_barrido(self.datos, espacio, max_procesos=2, semilla=0)
+
+        self.assertEqual(len(resultados), 8, "Debería haber una fila por configuración")
+        for columna in ['num_individuos', 'kmin', 'umbral_fitness', 'id_evolucion', 'num_prototipos', 'tiempo_evolucion', 'tiempo_extraccion']:
+            self.assertIn(columna, resultados.columns)
+
+        # Las configuraciones que sólo difieren en parámetros de extracción comparten la evolución
+        self.assertEqual(resultados['id_evolucion'].nunique(), 2, "Debería haber una evolución por num_individuos")
+        for _, grupo in resultados.groupby('id_evolucion'):
+            self.assertEqual(len(grupo), 4)
+            self.assertEqual(grupo['num_individuos'].nunique(), 1)
+            self.assertEqual(grupo['tiempo_evolucion'].nunique(), 1)
+
+        # Sin tasa_aprendizaje explícita se registra la tasa sorteada por HAEA
+        self.assertFalse(resultados['tasa_aprendizaje'].isna().any())
+        self.assertTrue(((resultados['tasa_aprendizaje'] >= 0) & (resultados['tasa_aprendizaje'] <= 1)).all())
+        for _, grupo in resultados.groupby('id_evolucion'):
+            self.assertEqual(grupo['tasa_aprendizaje'].nunique(), 1)
+
+    def test_configuraciones_aleatorias_enteras(self):
+        # Los rangos con límites enteros deben producir enteros
+        configuraciones = generar_configuraciones({'num_individuos': (4, 12), 'tasa_aprendizaje': (0.1, 0.5)}, modo='aleatorio', num_muestras=20, semilla=0)
+        for config in configuraciones:
+            self.assertIsInstance(config['num_individuos'], int)
+            self.assertTrue(4 <= config['num_individuos'] <= 12)
+            self.assertIsInstance(config['tasa_aprendizaje'], float)
+
+if __name__ == '__main__':
+    unittest.main()